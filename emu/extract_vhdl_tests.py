@@ -7,33 +7,140 @@ Usage:
     ./extract_vhdl_tests.py                    # Run all tests
     ./extract_vhdl_tests.py --vhdl-only        # Just parse, show tests
     ./extract_vhdl_tests.py --test 5           # Run specific test
+    ./extract_vhdl_tests.py -j 4               # Use 4 parallel emulator sessions
 """
 
 import re
 import subprocess
 import sys
 import os
+import mmap
 import tempfile
+import threading
 import argparse
+from array import array
+from functools import cached_property
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
-# Paths
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
-TB_FILE = os.path.join(PROJECT_ROOT, "tb", "tb_m65832_core.vhd")
-EMULATOR = os.path.join(PROJECT_ROOT, "emu", "m65832emu")
-ASSEMBLER = os.path.join(PROJECT_ROOT, "as", "m65832as")
+# Paths (resolved once at import)
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+TB_FILE = PROJECT_ROOT / "tb" / "tb_m65832_core.vhd"
+EMULATOR = PROJECT_ROOT / "emu" / "m65832emu"
+ASSEMBLER = PROJECT_ROOT / "as" / "m65832as"
+
+# Testbench patterns are bytes, as the file is scanned through an mmap
+
+# Test blocks (marked by "TEST N:" or "TEST 100G:" comments)
+_TEST_RE = re.compile(rb'--+\s*TEST\s+(\d+[A-Za-z]?):[ \t]*([^\n]+)', re.IGNORECASE)
+
+# poke(16#ADDR#, x"DATA")
+_POKE_RE = re.compile(
+    rb'poke\s*\(\s*16#([0-9A-Fa-f]+)#\s*,\s*x"([0-9A-Fa-f]+)"\s*\)',
+    re.IGNORECASE
+)
+
+# poke16(16#ADDR#, x"DATA")
+_POKE16_RE = re.compile(
+    rb'poke16\s*\(\s*16#([0-9A-Fa-f]+)#\s*,\s*x"([0-9A-Fa-f]+)"\s*\)',
+    re.IGNORECASE
+)
+
+# check_mem(16#ADDR#, x"EXPECTED", "msg")
+_CHECK_RE = re.compile(
+    rb'check_mem\s*\(\s*16#([0-9A-Fa-f]+)#\s*,\s*x"([0-9A-Fa-f]+)"\s*,\s*"([^"]+)"\s*\)',
+    re.IGNORECASE
+)
+
+# wait_cycles(N)
+_CYCLES_RE = re.compile(rb'wait_cycles\s*\(\s*(\d+)\s*\)', re.IGNORECASE)
+
+# Reset assertion - indicates start of a new phase
+_RESET_RE = re.compile(rb"rst_n\s*<=\s*'0'", re.IGNORECASE)
+
+# Interrupt signal assignments
+_IRQ_RE = re.compile(rb"irq_n\s*<=\s*'([01])'", re.IGNORECASE)
+_NMI_RE = re.compile(rb"nmi_n\s*<=\s*'([01])'", re.IGNORECASE)
+_ABORT_RE = re.compile(rb"abort_n\s*<=\s*'([01])'", re.IGNORECASE)
+
+# All of the above as one alternation, so the testbench is scanned in a single
+# pass. poke16 is tried before poke; matches never overlap, so a poke16 call
+# can't also be picked up as a poke. The leading lookahead lists the first
+# characters the statements can start with, so positions that can't start
+# any of them (most of the file) are rejected without trying each branch,
+# including the rarely-hit signal assignments.
+_TESTBENCH_RE = re.compile(b'(?=[-pcwrina])(?:%s)' % b'|'.join(
+    b'(?P<%s>%s)' % (name, regex.pattern) for name, regex in (
+        (b'test', _TEST_RE),
+        (b'poke16', _POKE16_RE),
+        (b'poke', _POKE_RE),
+        (b'check', _CHECK_RE),
+        (b'cycles', _CYCLES_RE),
+        (b'reset', _RESET_RE),
+        (b'irq', _IRQ_RE),
+        (b'nmi', _NMI_RE),
+        (b'abort', _ABORT_RE),
+    )
+), re.IGNORECASE)
+
+# One- and two-digit hex strings (as written in the testbench) -> value, so
+# poke/check data bytes don't each go through int(..., 16)
+_HEX_BYTES = {fmt % i: i for i in range(256) for fmt in (b'%x', b'%02x', b'%X', b'%02X')}
+
+
+def _hex(digits):
+    """int(digits, 16), with a table lookup for byte-sized values"""
+    value = _HEX_BYTES.get(digits)
+    return value if value is not None else int(digits, 16)
+
+
+# Emulator memory dump line: "0000ADDR: XX ...", the first one of a dump
+# following the debugger prompt. Anchoring at line starts keeps the scan
+# from trying a match at every character of the output.
+_DUMP_LINE_RE = re.compile(r'^(?:m65832> )?([0-9A-Fa-f]{8}):\s+([0-9A-Fa-f]{2})', re.MULTILINE)
+
+# Echoed ahead of each test in a batched emulator session
+_BATCH_MARKER = '=== next test ==='
+
+# Vectors written at the start of every test script, each one only if the
+# test doesn't poke that address itself
+_DEFAULT_VECTOR_LINES = (
+    (0xFFFC, 'w fffc 0'),
+    (0xFFFD, 'w fffd 80'),
+    (0xFFFE, 'w fffe 0'),
+    (0xFFFF, 'w ffff ff'),
+    (0xFF00, 'w ff00 db'),  # STP opcode
+    (0xFFFA, 'w fffa 0'),
+    (0xFFFB, 'w fffb ff'),
+    (0xFFF8, 'w fff8 0'),
+    (0xFFF9, 'w fff9 ff'),
+)
+
+# Byte value -> hex digits as written in script commands
+_HEX_DIGITS = [format(i, 'x') for i in range(256)]
+
+# Most bytes per 'wb' command; keeps lines well inside the debugger's
+# 256-byte line buffer
+_WRITE_RUN_MAX = 64
 
 
 class Phase:
     """Represents a single phase (reset/run cycle) within a test"""
     def __init__(self):
-        self.pokes = []      # [(addr, data), ...]
+        self.poke_addrs = array('I')  # Poke addresses...
+        self.poke_datas = array('B')  # ...and their data bytes, index-aligned
         self.checks = []     # [(addr, expected, msg, cycles_at_check), ...]
         self.cycles = 100    # Default cycles
         self.irq_active = False
         self.nmi_active = False
         self.abort_active = False
         self._cycles_so_far = 0  # Track cycles accumulated before each check
+    
+    @property
+    def pokes(self):
+        """Return pokes as [(addr, data), ...]"""
+        return list(zip(self.poke_addrs, self.poke_datas))
 
 
 class Test:
@@ -46,20 +153,34 @@ class Test:
         self.reset_vector = 0x8000  # Default
         
     def __repr__(self):
-        total_pokes = sum(len(p.pokes) for p in self.phases)
+        total_pokes = sum(len(p.poke_addrs) for p in self.phases)
         total_checks = sum(len(p.checks) for p in self.phases)
         return f"Test({self.number}, '{self.name}', {len(self.phases)} phases, {total_pokes} pokes, {total_checks} checks)"
     
-    # Legacy accessors for backward compatibility
-    @property
+    # Legacy accessors for backward compatibility. Computed on first use and
+    # cached, so phases must not change once a test has been parsed.
+    @cached_property
     def pokes(self):
         """Return all pokes from all phases"""
-        result = []
+        return list(zip(self.poke_addrs, self.poke_datas))
+    
+    @cached_property
+    def poke_addrs(self):
+        """Return all poke addresses from all phases"""
+        result = array('I')
         for phase in self.phases:
-            result.extend(phase.pokes)
+            result.extend(phase.poke_addrs)
         return result
     
-    @property
+    @cached_property
+    def poke_datas(self):
+        """Return all poke data bytes from all phases"""
+        result = array('B')
+        for phase in self.phases:
+            result.extend(phase.poke_datas)
+        return result
+    
+    @cached_property
     def checks(self):
         """Return all checks from all phases"""
         result = []
@@ -67,20 +188,20 @@ class Test:
             result.extend(phase.checks)
         return result
     
-    @property
+    @cached_property
     def cycles(self):
         """Return total cycles from all phases"""
         return sum(p.cycles for p in self.phases)
     
-    @property
+    @cached_property
     def irq_active(self):
         return any(p.irq_active for p in self.phases)
     
-    @property
+    @cached_property
     def nmi_active(self):
         return any(p.nmi_active for p in self.phases)
     
-    @property
+    @cached_property
     def abort_active(self):
         return any(p.abort_active for p in self.phases)
 
@@ -91,146 +212,105 @@ def parse_vhdl_testbench(filepath):
     current_test = None
     current_phase = None
     
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Find test blocks (marked by "TEST N:" or "TEST 100G:" comments)
-    test_pattern = re.compile(
-        r'--+\s*TEST\s+(\d+[A-Za-z]?):\s*([^\n]+)',
-        re.IGNORECASE
-    )
-    
-    # Find poke calls: poke(16#ADDR#, x"DATA")
-    poke_pattern = re.compile(
-        r'poke\s*\(\s*16#([0-9A-Fa-f]+)#\s*,\s*x"([0-9A-Fa-f]+)"\s*\)',
-        re.IGNORECASE
-    )
-    
-    # Find poke16 calls: poke16(16#ADDR#, x"DATA")
-    poke16_pattern = re.compile(
-        r'poke16\s*\(\s*16#([0-9A-Fa-f]+)#\s*,\s*x"([0-9A-Fa-f]+)"\s*\)',
-        re.IGNORECASE
-    )
-    
-    # Find check_mem calls: check_mem(16#ADDR#, x"EXPECTED", "msg")
-    check_pattern = re.compile(
-        r'check_mem\s*\(\s*16#([0-9A-Fa-f]+)#\s*,\s*x"([0-9A-Fa-f]+)"\s*,\s*"([^"]+)"\s*\)',
-        re.IGNORECASE
-    )
-    
-    # Find wait_cycles calls
-    cycles_pattern = re.compile(
-        r'wait_cycles\s*\(\s*(\d+)\s*\)',
-        re.IGNORECASE
-    )
+    # Pokes collected after checks, belong to next phase
+    pending_addrs, pending_datas = array('I'), array('B')
     
-    # Find reset signal - indicates start of a new phase
-    reset_pattern = re.compile(r"rst_n\s*<=\s*'0'", re.IGNORECASE)
+    if os.path.getsize(filepath) == 0:
+        return tests  # mmap can't map an empty file
     
-    # Find interrupt signal assignments
-    irq_pattern = re.compile(r"irq_n\s*<=\s*'([01])'", re.IGNORECASE)
-    nmi_pattern = re.compile(r"nmi_n\s*<=\s*'([01])'", re.IGNORECASE)
-    abort_pattern = re.compile(r"abort_n\s*<=\s*'([01])'", re.IGNORECASE)
-    
-    lines = content.split('\n')
-    i = 0
-    phase_has_reset = False  # Track if current phase has seen a reset
-    pending_pokes = []  # Pokes collected after checks, belong to next phase
-    
-    while i < len(lines):
-        line = lines[i]
-        
-        # Check for test header
-        test_match = test_pattern.search(line)
-        if test_match:
-            # Save previous test
-            if current_test:
-                if current_phase and (current_phase.pokes or current_phase.checks):
-                    current_test.phases.append(current_phase)
-                tests.append(current_test)
+    # Scan the file in place instead of reading it into a str
+    with open(filepath, 'rb') as f, \
+         mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        # Single pass over the file; statements are handled in source order
+        for match in _TESTBENCH_RE.finditer(content):
+            kind = match.lastgroup
+            g = match.lastindex  # Captures of the matched statement follow its group
+            
+            # Check for test header
+            if kind == 'test':
+                # Save previous test
+                if current_test:
+                    if current_phase and (current_phase.poke_addrs or current_phase.checks):
+                        current_test.phases.append(current_phase)
+                    tests.append(current_test)
+                
+                test_id = match.group(g + 1).decode()
+                test_name = match.group(g + 2).strip().decode()
+                current_test = Test(test_id, test_name)
+                current_phase = Phase()
+                pending_addrs, pending_datas = array('I'), array('B')
+                continue
+            
+            if not current_test:
+                continue
             
-            test_id = test_match.group(1)
-            test_name = test_match.group(2).strip()
-            current_test = Test(test_id, test_name)
-            current_phase = Phase()
-            phase_has_reset = False
-            pending_pokes = []
-            i += 1
-            continue
-        
-        if current_test:
             # Check for reset - indicates we're in the run portion of a phase
-            if reset_pattern.search(line):
+            if kind == 'reset':
                 # If we have pending pokes from after the last check, they start a new phase
-                if pending_pokes and current_phase and current_phase.checks:
+                if pending_addrs and current_phase and current_phase.checks:
                     current_test.phases.append(current_phase)
                     current_phase = Phase()
-                    current_phase.pokes = pending_pokes
-                    pending_pokes = []
-                phase_has_reset = True
+                    current_phase.poke_addrs = pending_addrs
+                    current_phase.poke_datas = pending_datas
+                    pending_addrs, pending_datas = array('I'), array('B')
             
             # Collect pokes
-            pokes_on_line = []
-            for match in poke16_pattern.finditer(line):
-                addr = int(match.group(1), 16)
-                data = int(match.group(2), 16)
-                pokes_on_line.append((addr, data & 0xFF))
-                pokes_on_line.append((addr + 1, (data >> 8) & 0xFF))
-            
-            if 'poke16' not in line.lower():
-                for match in poke_pattern.finditer(line):
-                    addr = int(match.group(1), 16)
-                    data = int(match.group(2), 16)
-                    pokes_on_line.append((addr, data))
-            
-            # If we have checks already and get new pokes, they belong to next phase
-            if pokes_on_line:
+            elif kind == 'poke16' or kind == 'poke':
+                # Addresses wrap to 32 bits, the emulator's address space (and
+                # what fits the 'I' column)
+                addr = int(match.group(g + 1), 16) & 0xFFFFFFFF
+                data = _hex(match.group(g + 2))
+                
+                # If we have checks already and get new pokes, they belong to next phase
                 if current_phase and current_phase.checks:
-                    pending_pokes.extend(pokes_on_line)
+                    addrs, datas = pending_addrs, pending_datas
                 elif current_phase:
-                    current_phase.pokes.extend(pokes_on_line)
+                    addrs, datas = current_phase.poke_addrs, current_phase.poke_datas
+                else:
+                    continue
+                
+                if kind == 'poke16':
+                    addrs.append(addr)
+                    datas.append(data & 0xFF)
+                    addrs.append((addr + 1) & 0xFFFFFFFF)
+                    datas.append((data >> 8) & 0xFF)
+                else:
+                    addrs.append(addr)
+                    datas.append(data & 0xFF)  # poke stores a byte
             
             # Look for wait_cycles - accumulate all waits > 10
-            # Must be processed BEFORE check_mem so we know cycles at check time
+            # Statements are handled in source order, so a check_mem records
+            # the cycles from the waits that come before it in the source
             # Note: VHDL uses ~2x more cycles per instruction than emulator,
             # so we scale cycle counts by 0.5 for intermediate check timing
-            for match in cycles_pattern.finditer(line):
-                cycles = int(match.group(1))
+            elif kind == 'cycles':
+                cycles = int(match.group(g + 1))
                 if cycles > 10 and current_phase:  # Ignore reset wait (usually 10 cycles)
                     # Keep full cycles for total run time, but track for checks at scaled time
                     current_phase._cycles_so_far += cycles // 2  # Scale for emulator timing
                     current_phase.cycles += cycles
             
             # Look for check_mem - record cycles at the time of check
-            for match in check_pattern.finditer(line):
-                addr = int(match.group(1), 16)
-                expected = int(match.group(2), 16)
-                msg = match.group(3)
+            elif kind == 'check':
+                addr = int(match.group(g + 1), 16)
+                expected = _hex(match.group(g + 2))
+                msg = match.group(g + 3).decode()
                 if current_phase:
                     # Record the cumulative cycles at this check point
                     current_phase.checks.append((addr, expected, msg, current_phase._cycles_so_far))
             
             # Look for interrupt signal assignments (active-low signals)
-            irq_match = irq_pattern.search(line)
-            if irq_match and current_phase:
-                if irq_match.group(1) == '0':
+            elif current_phase and match.group(g + 1) == b'0':
+                if kind == 'irq':
                     current_phase.irq_active = True
-            
-            nmi_match = nmi_pattern.search(line)
-            if nmi_match and current_phase:
-                if nmi_match.group(1) == '0':
+                elif kind == 'nmi':
                     current_phase.nmi_active = True
-            
-            abort_match = abort_pattern.search(line)
-            if abort_match and current_phase:
-                if abort_match.group(1) == '0':
+                elif kind == 'abort':
                     current_phase.abort_active = True
-        
-        i += 1
     
     # Save final test
     if current_test:
-        if current_phase and (current_phase.pokes or current_phase.checks):
+        if current_phase and (current_phase.poke_addrs or current_phase.checks):
             current_test.phases.append(current_phase)
         tests.append(current_test)
     
@@ -240,21 +320,25 @@ def parse_vhdl_testbench(filepath):
 def create_test_binary(test):
     """Create a binary file from test pokes"""
     # Find the range of memory used
-    if not test.pokes:
+    addrs = test.poke_addrs
+    if not addrs:
         return None, 0, 0
     
-    addrs = [p[0] for p in test.pokes]
     min_addr = min(addrs)
     max_addr = max(addrs)
     
-    # Create memory image
+    # Create memory image; callers only write it out, so hand back the
+    # bytearray itself rather than a bytes() copy of it
     size = max_addr - min_addr + 1
     memory = bytearray(size)
     
-    for addr, data in test.pokes:
-        memory[addr - min_addr] = data
+    if size == len(addrs) and addrs == array('I', range(min_addr, max_addr + 1)):
+        memory[:] = test.poke_datas  # One contiguous ascending block
+    else:
+        for offset, data in zip([addr - min_addr for addr in addrs], test.poke_datas):
+            memory[offset] = data
     
-    return bytes(memory), min_addr, max_addr
+    return memory, min_addr, max_addr
 
 
 def run_emulator_test(test, verbose=False):
@@ -265,22 +349,33 @@ def run_emulator_test(test, verbose=False):
     if binary is None:
         return None, "No pokes in test"
     
-    # Write binary to temp file
-    with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
-        f.write(binary)
-        bin_path = f.name
+    # Hand the binary over in an anonymous in-memory file where the OS has
+    # one (Linux); the emulator opens it through /proc. Elsewhere fall back
+    # to a temp file.
+    if hasattr(os, 'memfd_create'):
+        bin_fd = os.memfd_create('m65832-test')
+        with os.fdopen(bin_fd, 'wb', closefd=False) as f:
+            f.write(binary)
+        bin_path = f'/proc/self/fd/{bin_fd}'
+        pass_fds = (bin_fd,)
+    else:
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            f.write(binary)
+            bin_fd = None
+            bin_path = f.name
+        pass_fds = ()
     
     try:
         # The VHDL testbench uses reset vector at $FFFC pointing to $8000
         # We need to handle this properly
         
         # Check if this test includes reset vector setup
-        has_reset_vector = any(addr == 0xFFFC or addr == 0xFFFD for addr, _ in test.pokes)
+        has_reset_vector = any(addr == 0xFFFC or addr == 0xFFFD for addr in test.poke_addrs)
         
         # Build emulator command
         # Use --emulation mode since VHDL tests are in 8-bit emulation mode
         cmd = [
-            EMULATOR,
+            str(EMULATOR),
             '--emulation',      # 8-bit mode like VHDL tests
             '-m', '256',        # 256KB memory
             '-c', str(test.cycles + 50),  # Extra cycles for safety
@@ -300,7 +395,8 @@ def run_emulator_test(test, verbose=False):
             print(f"  Command: {' '.join(cmd)}")
         
         # Run emulator
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5,
+                                pass_fds=pass_fds)
         
         if result.returncode != 0 and verbose:
             print(f"  Emulator stderr: {result.stderr}")
@@ -315,55 +411,73 @@ def run_emulator_test(test, verbose=False):
         return True, "Executed (memory check not yet implemented)"
         
     finally:
-        os.unlink(bin_path)
+        if bin_fd is not None:
+            os.close(bin_fd)
+        else:
+            os.unlink(bin_path)
+
+
+def append_write(script_lines, addr, data):
+    """Add the command writing a run of bytes starting at addr"""
+    if len(data) == 1:
+        script_lines.append(f'w {addr:x} {_HEX_DIGITS[data[0]]}')
+    else:
+        script_lines.append(f'wb {addr:x} {data.hex()}')
 
 
-def run_phase(phase, script_lines, all_pokes_so_far, verbose=False):
+def run_phase(phase, script_lines, all_pokes_so_far):
     """
     Add commands for a single phase to the script.
     Returns the set of addresses poked so far (including this phase).
     """
     
-    # Get set of addresses for filtering (before we modify)
-    original_addresses = {addr for addr, _ in phase.pokes}
+    # The phase's memory image, address -> data (a later poke to the same
+    # address wins). Built in one go from the poke columns; the phase itself
+    # is left untouched so a test's script can be rebuilt.
+    memory = dict(zip(phase.poke_addrs, phase.poke_datas))
     uses_interrupts = phase.irq_active or phase.nmi_active or phase.abort_active
     
-    # VHDL testbench has RESET_PC => x"00008000" hardcoded, so the reset vector
-    # isn't read from memory. We need to set the reset vector to $8000 for the
-    # emulator to match this behavior. Remove any test-set values and override.
-    phase.pokes = [(addr, data) for addr, data in phase.pokes if addr not in (0xFFFC, 0xFFFD)]
-    phase.pokes.append((0xFFFC, 0x00))  # Reset vector low byte
-    phase.pokes.append((0xFFFD, 0x80))  # Reset vector high byte -> $8000
-    
     # Add default IRQ vector ($FF00 -> STP) if not set
-    if 0xFFFE not in original_addresses:
-        phase.pokes.append((0xFFFE, 0x00))  # IRQ vector low byte
-        phase.pokes.append((0xFFFF, 0xFF))  # IRQ vector high byte -> $FF00
-    if 0xFF00 not in original_addresses:
-        phase.pokes.append((0xFF00, 0xDB))  # STP instruction at IRQ handler
-    
-    # Update original_addresses after modifications
-    original_addresses = {addr for addr, _ in phase.pokes}
-    
-    # Filter pokes (same logic as before for vector workaround)
-    filtered_pokes = []
-    for addr, data in phase.pokes:
-        if uses_interrupts:
-            # Filter duplicate vector writes that could confuse interrupt handling
-            if addr == 0xFFFA and 0xFFF8 in original_addresses and 0xFFF9 in original_addresses:
-                continue
-            if addr == 0xFFFB and 0xFFF8 in original_addresses and 0xFFF9 in original_addresses:
-                continue
-            # Note: Don't filter $FFFC/$FFFD - we always need the reset vector
-        filtered_pokes.append((addr, data))
+    if 0xFFFE not in memory:
+        memory[0xFFFE] = 0x00  # IRQ vector low byte
+        memory[0xFFFF] = 0xFF  # IRQ vector high byte -> $FF00
+    if 0xFF00 not in memory:
+        memory[0xFF00] = 0xDB  # STP instruction at IRQ handler
     
-    # Write memory locations for this phase
-    for addr, data in filtered_pokes:
-        script_lines.append(f'w {addr:x} {data:x}')
-        all_pokes_so_far.add(addr)
-        # Mirror writes for 64KB wrapping
-        if addr < 0x10000:
-            script_lines.append(f'w {addr + 0x10000:x} {data:x}')
+    # VHDL testbench has RESET_PC => x"00008000" hardcoded, so the reset vector
+    # isn't read from memory. We need to set the reset vector to $8000 for the
+    # emulator to match this behavior. Override any test-set values.
+    memory[0xFFFC] = 0x00  # Reset vector low byte
+    memory[0xFFFD] = 0x80  # Reset vector high byte -> $8000
+    
+    # Filter duplicate vector writes that could confuse interrupt handling.
+    # None of the vectors added above are $FFF8/$FFF9, so this only depends
+    # on the phase's own pokes.
+    # Note: Don't filter $FFFC/$FFFD - we always need the reset vector
+    if uses_interrupts and 0xFFF8 in memory and 0xFFF9 in memory:
+        memory.pop(0xFFFA, None)
+        memory.pop(0xFFFB, None)
+    
+    all_pokes_so_far.update(memory)
+    
+    # Mirror writes for 64KB wrapping. Writes go out in address order, not
+    # poke order, so an address the phase pokes itself keeps its own value
+    # rather than the mirror of the byte $10000 below it.
+    for addr in [addr for addr in memory if addr < 0x10000]:
+        memory.setdefault(addr + 0x10000, memory[addr])
+    
+    # Write memory locations for this phase, one command per run of
+    # consecutive addresses
+    run = bytearray()
+    for addr in sorted(memory):
+        if run and (addr != start + len(run) or len(run) == _WRITE_RUN_MAX):
+            append_write(script_lines, start, run)
+            run = bytearray()
+        if not run:
+            start = addr
+        run.append(memory[addr])
+    if run:
+        append_write(script_lines, start, run)
     
     # Reset
     script_lines.append('reset')
@@ -386,11 +500,9 @@ def run_phase(phase, script_lines, all_pokes_so_far, verbose=False):
     # Use 'step N' (instruction count) instead of 'r N' (cycle count) for precise timing
     # Approximate instruction count = cycles / 3 (average instruction takes ~3 emulator cycles)
     if phase.checks:
-        checks_by_cycle = {}
+        checks_by_cycle = {}  # cycles_at -> [addr, ...]
         for addr, expected, msg, cycles_at in phase.checks:
-            if cycles_at not in checks_by_cycle:
-                checks_by_cycle[cycles_at] = []
-            checks_by_cycle[cycles_at].append((addr, expected, msg))
+            checks_by_cycle.setdefault(cycles_at, []).append(addr)
         
         # Run to each check point and read memory
         prev_inst = 0
@@ -403,8 +515,7 @@ def run_phase(phase, script_lines, all_pokes_so_far, verbose=False):
             prev_inst = inst_count
             
             # Read memory for checks at this cycle point
-            for addr, expected, msg in checks_by_cycle[cycles_at]:
-                script_lines.append(f'm {addr:x} 1')
+            script_lines.extend([f'm {addr:x} 1' for addr in checks_by_cycle[cycles_at]])
         
         # Run remaining instructions after last check (estimate total from phase cycles)
         total_inst = max(1, phase.cycles // 3)
@@ -418,117 +529,136 @@ def run_phase(phase, script_lines, all_pokes_so_far, verbose=False):
     return all_pokes_so_far
 
 
-def run_emulator_test_v2(test, verbose=False):
+def build_test_script(test):
     """
-    Run test using interactive mode to poke memory, run, and check results.
-    This mirrors exactly what the VHDL testbench does, including multiple phases.
+    Build the interactive emulator script for a test.
+    Returns (script_lines, checks) where checks are (addr, expected, msg).
     """
-    
-    results = {'passed': 0, 'failed': 0, 'errors': []}
-    
-    if not test.phases:
-        return results
-    
-    # Build interactive script
-    script_lines = []
-    
-    # Collect all addresses that will be poked across all phases
-    all_test_addresses = set()
-    for phase in test.phases:
-        for addr, _ in phase.pokes:
-            all_test_addresses.add(addr)
-    
     # Set up default vectors (only if test doesn't override them)
-    if 0xFFFC not in all_test_addresses:
-        script_lines.append('w fffc 0')
-    if 0xFFFD not in all_test_addresses:
-        script_lines.append('w fffd 80')
-    if 0xFFFE not in all_test_addresses:
-        script_lines.append('w fffe 0')
-    if 0xFFFF not in all_test_addresses:
-        script_lines.append('w ffff ff')
-    if 0xFF00 not in all_test_addresses:
-        script_lines.append('w ff00 db')  # STP opcode
-    if 0xFFFA not in all_test_addresses:
-        script_lines.append('w fffa 0')
-    if 0xFFFB not in all_test_addresses:
-        script_lines.append('w fffb ff')
-    if 0xFFF8 not in all_test_addresses:
-        script_lines.append('w fff8 0')
-    if 0xFFF9 not in all_test_addresses:
-        script_lines.append('w fff9 ff')
+    all_test_addresses = set(test.poke_addrs)
+    script_lines = [line for addr, line in _DEFAULT_VECTOR_LINES
+                    if addr not in all_test_addresses]
     
     # Track all checks for parsing output later (just addr, expected, msg)
     all_checks = []
     all_pokes_so_far = set()
     
     # Run each phase
-    for phase_idx, phase in enumerate(test.phases):
-        all_pokes_so_far = run_phase(phase, script_lines, all_pokes_so_far, verbose)
+    for phase in test.phases:
+        all_pokes_so_far = run_phase(phase, script_lines, all_pokes_so_far)
         # Extract just addr, expected, msg from checks (drop cycles_at)
-        for check in phase.checks:
-            if len(check) == 4:
-                addr, expected, msg, _ = check
-            else:
-                addr, expected, msg = check
-            all_checks.append((addr, expected, msg))
-    
-    script_lines.append('q')
-    script = '\n'.join(script_lines) + '\n'
+        all_checks.extend([check[:3] for check in phase.checks])
     
-    if verbose:
-        total_pokes = sum(len(p.pokes) for p in test.phases)
-        total_cycles = sum(p.cycles for p in test.phases)
-        print(f"  Script ({total_pokes} pokes, {total_cycles} cycles, {len(test.phases)} phases):")
-        if len(script_lines) < 30:
-            for line in script_lines[:-1]:
-                print(f"    {line}")
+    return script_lines, all_checks
+
+
+def print_test_script(test, script_lines):
+    """Print a test's emulator script (verbose mode)"""
+    total_pokes = sum(len(p.poke_addrs) for p in test.phases)
+    total_cycles = sum(p.cycles for p in test.phases)
+    print(f"  Script ({total_pokes} pokes, {total_cycles} cycles, {len(test.phases)} phases):")
+    if len(script_lines) < 29:
+        for line in script_lines:
+            print(f"    {line}")
+
+
+def run_emulator_script(script_lines, timeout=30, verbose=False):
+    """Run script lines through the emulator's interactive mode, return its stdout"""
+    # Run emulator in interactive mode
+    cmd = [
+        str(EMULATOR),
+        '--emulation',
+        '-m', '256',
+        '-i',
+    ]
+    
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE if verbose else subprocess.DEVNULL,
+                            text=True)
+    
+    # Stream the lines straight into the pipe instead of joining the whole
+    # script first; a thread does it so the emulator's output can't back up
+    def feed():
+        try:
+            proc.stdin.writelines(f'{line}\n' for line in script_lines)
+            proc.stdin.write('q\n')
+            proc.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass  # Emulator went away; the reader sees EOF
+    
+    writer = threading.Thread(target=feed, daemon=True)
+    watchdog = threading.Timer(timeout, proc.kill)
+    writer.start()
+    watchdog.start()
+    
+    output = proc.stdout.read()
+    errors = proc.stderr.read() if verbose else ''
+    
+    timed_out = not watchdog.is_alive()
+    watchdog.cancel()
+    proc.wait()
+    writer.join()
+    
+    if timed_out:
+        raise subprocess.TimeoutExpired(cmd, timeout, output=output)
+    
+    if verbose and proc.returncode != 0:
+        print(f"  Emulator stderr: {errors[:200]}")
+    
+    return output
+
+
+def parse_memory_dump(output):
+    """Map address -> byte from emulator memory dumps; the first dump of an address wins"""
+    mem = {}
+    for dump_addr, dump_byte in _DUMP_LINE_RE.findall(output):
+        mem.setdefault(int(dump_addr, 16), int(dump_byte, 16))
+    return mem
+
+
+def check_test_output(all_checks, mem, verbose=False):
+    """Compare dumped memory (see parse_memory_dump) against expected values"""
+    results = {'passed': 0, 'failed': 0, 'errors': []}
     
-    try:
-        # Run emulator in interactive mode
-        cmd = [
-            EMULATOR,
-            '--emulation',
-            '-m', '256',
-            '-i',
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30,
-            input=script
-        )
-        
-        output = result.stdout
+    for addr, expected, msg in all_checks:
+        actual = mem.get(addr)
         
-        if verbose and result.returncode != 0:
-            print(f"  Emulator stderr: {result.stderr[:200]}")
-        
-        # Parse memory dump output to check values
-        for addr, expected, msg in all_checks:
-            pattern = rf'{addr:08X}:\s+([0-9A-Fa-f]{{2}})'
-            match = re.search(pattern, output, re.IGNORECASE)
-            
-            if match:
-                actual = int(match.group(1), 16)
-                if actual == expected:
-                    results['passed'] += 1
-                    if verbose:
-                        print(f"    PASS: {msg} (${addr:04X} = ${actual:02X})")
-                else:
-                    results['failed'] += 1
-                    results['errors'].append(f"{msg}: expected ${expected:02X}, got ${actual:02X}")
-                    if verbose:
-                        print(f"    FAIL: {msg} (${addr:04X} = ${actual:02X}, expected ${expected:02X})")
+        if actual is not None:
+            if actual == expected:
+                results['passed'] += 1
+                if verbose:
+                    print(f"    PASS: {msg} (${addr:04X} = ${actual:02X})")
             else:
                 results['failed'] += 1
-                results['errors'].append(f"{msg}: could not read address ${addr:04X}")
+                results['errors'].append(f"{msg}: expected ${expected:02X}, got ${actual:02X}")
                 if verbose:
-                    print(f"    ERROR: Could not find ${addr:04X} in output")
-        
-        return results
+                    print(f"    FAIL: {msg} (${addr:04X} = ${actual:02X}, expected ${expected:02X})")
+        else:
+            results['failed'] += 1
+            results['errors'].append(f"{msg}: could not read address ${addr:04X}")
+            if verbose:
+                print(f"    ERROR: Could not find ${addr:04X} in output")
+    
+    return results
+
+
+def run_emulator_test_v2(test, verbose=False):
+    """
+    Run test using interactive mode to poke memory, run, and check results.
+    This mirrors exactly what the VHDL testbench does, including multiple phases.
+    """
+    
+    if not test.phases:
+        return {'passed': 0, 'failed': 0, 'errors': []}
+    
+    script_lines, all_checks = build_test_script(test)
+    
+    if verbose:
+        print_test_script(test, script_lines)
+    
+    try:
+        output = run_emulator_script(script_lines, verbose=verbose)
+        return check_test_output(all_checks, parse_memory_dump(output), verbose)
         
     except subprocess.TimeoutExpired:
         return {'passed': 0, 'failed': len(all_checks), 'errors': ['Timeout']}
@@ -536,16 +666,120 @@ def run_emulator_test_v2(test, verbose=False):
         return {'passed': 0, 'failed': len(all_checks), 'errors': [str(e)]}
 
 
+def run_emulator_batch(tests, timeout=30):
+    """
+    Run several tests back-to-back in a single emulator session.
+    
+    Memory is cleared before each test and every phase starts with a reset,
+    so each test sees the same state it would in a session of its own.
+    Scripts are generated and fed to the emulator from a writer thread while
+    its output is read and parsed here, so the three overlap.
+    Each test gets its own timeout seconds; a test that runs past it ends
+    the session.
+    Returns a list with one (script_lines, checks, mem) entry per test, or
+    None for tests whose output was not received; those should be run
+    individually.
+    """
+    cmd = [
+        str(EMULATOR),
+        '--emulation',
+        '-m', '256',
+        '-i',
+    ]
+    
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return [None] * len(tests)
+    
+    scripts = []  # (test, script_lines, checks), appended by the writer
+    
+    def feed():
+        try:
+            for test in tests:
+                script_lines, all_checks = build_test_script(test)
+                scripts.append((test, script_lines, all_checks))
+                proc.stdin.write(f'zero\necho {_BATCH_MARKER}\n')
+                proc.stdin.write('\n'.join(script_lines) + '\n')
+            proc.stdin.write('q\n')
+            proc.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass  # Emulator went away; the reader sees EOF
+    
+    timed_out = threading.Event()
+    
+    def kill():
+        timed_out.set()
+        proc.kill()
+    
+    writer = threading.Thread(target=feed, daemon=True)
+    watchdog = threading.Timer(timeout, kill)
+    writer.start()
+    watchdog.start()
+    
+    # Each marker closes the previous test's section; the debugger banner
+    # before the first marker is skipped
+    sections = []
+    section = None
+    for line in proc.stdout:
+        if _BATCH_MARKER in line:
+            if section is not None:
+                sections.append(parse_memory_dump(''.join(section)))
+            section = []
+            # Re-arm the watchdog for the test that starts here
+            watchdog.cancel()
+            watchdog = threading.Timer(timeout, kill)
+            watchdog.start()
+        elif section is not None:
+            section.append(line)
+    
+    watchdog.cancel()
+    proc.wait()
+    writer.join()
+    
+    # If the emulator was killed, the last section is incomplete; leave
+    # that test (and any it never reached) to an individual run
+    if section is not None and not timed_out.is_set():
+        sections.append(parse_memory_dump(''.join(section)))
+    
+    results = [(script_lines, all_checks, mem)
+               for (_, script_lines, all_checks), mem in zip(scripts, sections)]
+    return results + [None] * (len(tests) - len(results))
+
+
+def run_emulator_parallel(tests, jobs=None):
+    """
+    Split tests across several batched emulator sessions (see
+    run_emulator_batch), each driven from its own worker process.
+    Returns the per-test entries in the same order as tests.
+    """
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tests)))
+    if jobs == 1:
+        return run_emulator_batch(tests)
+    
+    # Contiguous chunks, so concatenating the results restores test order
+    size = -(-len(tests) // jobs)
+    chunks = [tests[i:i + size] for i in range(0, len(tests), size)]
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        for chunk_results in pool.map(run_emulator_batch, chunks):
+            results.extend(chunk_results)
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description='Extract and run VHDL tests on emulator')
     parser.add_argument('--vhdl-only', action='store_true', help='Just parse and show tests')
     parser.add_argument('--test', type=str, action='append', help='Run specific test ID(s), e.g. 122 or 100G')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
     parser.add_argument('--list', '-l', action='store_true', help='List all tests')
+    parser.add_argument('--jobs', '-j', type=int, help='Number of emulator sessions to run in parallel (default: CPU count)')
     args = parser.parse_args()
     
     # Check emulator exists
-    if not os.path.exists(EMULATOR):
+    if not EMULATOR.exists():
         print(f"Error: Emulator not found at {EMULATOR}")
         print("Run 'make' in the emu/ directory first")
         sys.exit(1)
@@ -559,13 +793,13 @@ def main():
         for test in tests:
             if args.verbose:
                 print(f"Test {test.number}: {test.name}")
-                print(f"  Phases: {len(test.phases)}, Total pokes: {len(test.pokes)}, Total checks: {len(test.checks)}, Total cycles: {test.cycles}")
+                print(f"  Phases: {len(test.phases)}, Total pokes: {len(test.poke_addrs)}, Total checks: {len(test.checks)}, Total cycles: {test.cycles}")
                 for pi, phase in enumerate(test.phases):
-                    print(f"  Phase {pi+1}: {len(phase.pokes)} pokes, {len(phase.checks)} checks, {phase.cycles} cycles")
-                    for addr, data in phase.pokes[:3]:
+                    print(f"  Phase {pi+1}: {len(phase.poke_addrs)} pokes, {len(phase.checks)} checks, {phase.cycles} cycles")
+                    for addr, data in zip(phase.poke_addrs[:3], phase.poke_datas):
                         print(f"      poke(${addr:04X}, ${data:02X})")
-                    if len(phase.pokes) > 3:
-                        print(f"      ... and {len(phase.pokes) - 3} more pokes")
+                    if len(phase.poke_addrs) > 3:
+                        print(f"      ... and {len(phase.poke_addrs) - 3} more pokes")
                     for addr, expected, msg in phase.checks:
                         print(f"      check(${addr:04X}, ${expected:02X}, \"{msg}\")")
                 print()
@@ -589,6 +823,12 @@ def main():
     print("=" * 60)
     print()
     
+    # Run everything in batched emulator sessions unless a single test was picked
+    runnable = [t for t in tests if t.checks and t.phases]
+    batched = {}
+    if len(runnable) > 1:
+        batched = dict(zip(runnable, run_emulator_parallel(runnable, args.jobs)))
+    
     for test in tests:
         print(f"Test {test.number}: {test.name}")
         
@@ -597,7 +837,13 @@ def main():
             print()
             continue
         
-        results = run_emulator_test_v2(test, verbose=args.verbose)
+        if batched.get(test):
+            script_lines, all_checks, mem = batched[test]
+            if args.verbose:
+                print_test_script(test, script_lines)
+            results = check_test_output(all_checks, mem, verbose=args.verbose)
+        else:
+            results = run_emulator_test_v2(test, verbose=args.verbose)
         
         total_passed += results['passed']
         total_failed += results['failed']
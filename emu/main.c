@@ -304,6 +304,7 @@ static void interactive_mode(m65832_cpu_t *cpu) {
             printf("  wl                 List watchpoints\n");
             printf("Registers:\n");
             printf("  w, write ADDR VAL  Write byte to memory\n");
+            printf("  wb ADDR HEXBYTES   Write bytes to memory (e.g. wb 8000 a9ff)\n");
             printf("  pc ADDR            Set program counter\n");
             printf("  a VAL              Set accumulator\n");
             printf("  x VAL              Set X register\n");
@@ -324,6 +325,8 @@ static void interactive_mode(m65832_cpu_t *cpu) {
             printf("  nmi                Trigger NMI\n");
             printf("  abort              Trigger ABORT\n");
             printf("  trace [on|off]     Toggle instruction tracing\n");
+            printf("  zero               Clear all memory\n");
+            printf("  echo TEXT          Print TEXT (marks scripted output)\n");
             printf("  q, quit            Exit debugger\n");
         }
         else if (strcmp(cmd, "s") == 0 || strcmp(cmd, "step") == 0) {
@@ -426,6 +429,28 @@ static void interactive_mode(m65832_cpu_t *cpu) {
                 printf("Usage: write ADDR VALUE\n");
             }
         }
+        else if (strcmp(cmd, "wb") == 0) {
+            /* Write a run of bytes given as one hex string */
+            if (argc >= 3) {
+                const char *hex = line;
+                int n = 0;
+                for (int field = 0; field < 2; field++) {
+                    while (isspace((unsigned char)*hex)) hex++;
+                    while (*hex && !isspace((unsigned char)*hex)) hex++;
+                }
+                while (isspace((unsigned char)*hex)) hex++;
+                while (isxdigit((unsigned char)hex[0]) && isxdigit((unsigned char)hex[1])) {
+                    unsigned int val;
+                    sscanf(hex, "%2x", &val);
+                    m65832_emu_write8(cpu, arg1 + n, (uint8_t)val);
+                    hex += 2;
+                    n++;
+                }
+                printf("Wrote %d bytes to %08X\n", n, arg1);
+            } else {
+                printf("Usage: wb ADDR HEXBYTES\n");
+            }
+        }
         else if (strcmp(cmd, "pc") == 0) {
             if (argc >= 2) {
                 m65832_set_pc(cpu, arg1);
@@ -656,6 +681,20 @@ static void interactive_mode(m65832_cpu_t *cpu) {
                 printf("Usage: addr SYMBOL_NAME\n");
             }
         }
+        else if (strcmp(cmd, "zero") == 0) {
+            uint8_t *mem = m65832_emu_get_memory_ptr(cpu);
+            if (mem) memset(mem, 0, m65832_emu_get_memory_size(cpu));
+            printf("Memory cleared\n");
+        }
+        else if (strcmp(cmd, "echo") == 0) {
+            /* Print the rest of the line verbatim */
+            const char *text = line;
+            while (isspace((unsigned char)*text)) text++;
+            text += strlen(cmd);
+            while (*text == ' ' || *text == '\t') text++;
+            fputs(text, stdout);
+            if (!strchr(text, '\n')) printf("\n");
+        }
         else if (strcmp(cmd, "q") == 0 || strcmp(cmd, "quit") == 0 ||
                  strcmp(cmd, "exit") == 0) {
             break;
@@ -11,6 +11,7 @@
 #   ./run_tests.sh --list       # List available tests
 #   ./run_tests.sh --categories # List test categories
 #   ./run_tests.sh -v 122       # Run test 122 with verbose output
+#   ./run_tests.sh -j 4         # Run all tests in 4 parallel emulator sessions
 #
 
 set -e
@@ -58,6 +59,7 @@ usage() {
     echo "  -l, --list        List all available tests"
     echo "  -c, --categories  List test categories"
     echo "  -q, --quiet       Only show summary"
+    echo "  -j, --jobs N      Parallel emulator sessions (default: CPU count)"
     echo "  --failing         Only run previously failing tests"
     echo "  --build           Rebuild emulator before testing"
     echo ""
@@ -128,6 +130,7 @@ build_emulator() {
 # Parse arguments
 VERBOSE=""
 QUIET=""
+JOBS=""
 BUILD=""
 TEST_SPECS=""
 
@@ -145,6 +148,15 @@ while [ $# -gt 0 ]; do
             QUIET="1"
             shift
             ;;
+        -j|--jobs)
+            if [ $# -lt 2 ]; then
+                echo "Option $1 requires a value"
+                usage
+                exit 1
+            fi
+            JOBS="--jobs $2"
+            shift 2
+            ;;
         -l|--list)
             list_tests
             exit 0
@@ -233,10 +245,10 @@ echo -e "${BLUE}Running M65832 emulator tests...${NC}"
 echo ""
 
 if [ -n "$QUIET" ]; then
-    python3 "$TEST_SCRIPT" $VERBOSE $TEST_ARGS 2>&1 | tail -10
+    python3 "$TEST_SCRIPT" $VERBOSE $JOBS $TEST_ARGS 2>&1 | tail -10
     exit_code=${PIPESTATUS[0]}
 else
-    python3 "$TEST_SCRIPT" $VERBOSE $TEST_ARGS 2>&1
+    python3 "$TEST_SCRIPT" $VERBOSE $JOBS $TEST_ARGS 2>&1
     exit_code=$?
 fi
 
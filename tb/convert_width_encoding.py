@@ -15,6 +15,7 @@ New scheme (thermometer W encoding):
 
 import re
 import sys
+from bisect import bisect_left
 
 
 POKE_PAT = re.compile(
@@ -22,45 +23,69 @@ POKE_PAT = re.compile(
     re.IGNORECASE
 )
 
+TEST_PAT = re.compile(r'--+\s*TEST\s+(\d+[A-Za-z]?):\s*([^\n]+)', re.IGNORECASE)
 
-def parse_test_blocks(filepath):
-    """Parse VHDL file into test blocks with their line ranges."""
-    with open(filepath) as f:
-        lines = f.readlines()
+RST_PAT = re.compile(r"rst_n\s*<=\s*'0'", re.IGNORECASE)
+
+INDENT_PAT = re.compile(r'^(\s*)')
 
-    test_pat = re.compile(r'--+\s*TEST\s+(\d+[A-Za-z]?):\s*([^\n]+)', re.IGNORECASE)
 
+def parse_test_blocks(filepath):
+    """Parse VHDL file into test blocks with their line ranges.
+
+    Also returns a poke index mapping line_idx -> [(addr, data, match), ...]
+    for every line holding poke calls, and the sorted indices of all
+    rst_n <= '0' lines, so sub-programs don't rescan lines.
+    """
+    lines = []
     tests = []
+    poke_index = {}
+    rst_lines = []
     current_test = None
     current_start = None
 
-    for i, line in enumerate(lines):
-        m = test_pat.search(line)
-        if m:
-            if current_test is not None:
-                tests.append((current_test, current_start, i))
-            current_test = m.group(1)
-            current_start = i
+    # Scan lines as they are read; they are kept since the file is rewritten
+    with open(filepath) as f:
+        for i, line in enumerate(f):
+            lines.append(line)
+
+            # Cheap case-insensitive literal checks pick out the few lines
+            # each regex has to run on (the header regex in particular is
+            # slow to reject lines with long runs of dashes)
+            upper = line.upper()
+
+            if 'POKE' in upper:
+                pokes = [(int(m.group(2), 16), int(m.group(4), 16), m) for m in POKE_PAT.finditer(line)]
+                if pokes:
+                    poke_index[i] = pokes
+
+            if 'RST_N' in upper and RST_PAT.search(line):
+                rst_lines.append(i)
+
+            if 'TEST' not in upper:
+                continue
+            m = TEST_PAT.search(line)
+            if m:
+                if current_test is not None:
+                    tests.append((current_test, current_start, i))
+                current_test = m.group(1)
+                current_start = i
 
     if current_test is not None:
         tests.append((current_test, current_start, len(lines)))
 
-    return lines, tests
+    return lines, tests, poke_index, rst_lines
 
 
-def find_sub_programs(lines, start, end):
+def find_sub_programs(rst_lines, start, end):
     """Split a test block into sub-programs separated by rst_n <= '0' lines.
 
     Returns list of (sub_start, sub_end) tuples for each sub-program's poke region.
     A sub-program is the set of poke lines between the previous rst_n/check_mem and the next rst_n.
+    rst_lines is the sorted list of rst_n line indices from parse_test_blocks.
     """
-    rst_pat = re.compile(r"rst_n\s*<=\s*'0'", re.IGNORECASE)
-
     # Find all rst_n lines within this test
-    rst_lines = []
-    for i in range(start, end):
-        if rst_pat.search(lines[i]):
-            rst_lines.append(i)
+    rst_lines = rst_lines[bisect_left(rst_lines, start):bisect_left(rst_lines, end)]
 
     if not rst_lines:
         return [(start, end)]
@@ -79,108 +104,137 @@ def find_sub_programs(lines, start, end):
     return sub_programs
 
 
-def extract_pokes_in_range(lines, start, end):
+def extract_pokes_in_range(poke_index, start, end):
     """Extract poke calls from a line range, returning list of (line_idx, addr, data, match)."""
-    pokes = []
-    for i in range(start, end):
-        for m in POKE_PAT.finditer(lines[i]):
-            addr = int(m.group(2), 16)
-            data = int(m.group(4), 16)
-            pokes.append((i, addr, data, m))
-    return pokes
+    return [(i, addr, data, m)
+            for i in range(start, end)
+            for addr, data, m in poke_index.get(i, ())]
 
 
-def identify_mode_pattern(code):
-    """Identify old-style mode entry pattern from byte map at $8000+.
-
-    Returns: (pattern_name, pattern_length_bytes, replacement_bytes, description)
-    or None if no conversion needed.
-    """
-    if 0x8000 not in code:
-        return None
-
-    b = [code.get(0x8000 + i, 0) for i in range(8)]
-
+# Old-style mode entry sequences at $8000 -> (pattern_name, pattern_length_bytes,
+# replacement_bytes, description)
+MODE_PATTERNS = {
     # 8-byte: REP #$40; SEP #$80; REP #$10; SEP #$20 (32-bit M+X)
-    if (b[0] == 0xC2 and b[1] == 0x40 and b[2] == 0xE2 and b[3] == 0x80 and
-        b[4] == 0xC2 and b[5] == 0x10 and b[6] == 0xE2 and b[7] == 0x20):
-        return ('32bit', 8, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)')
+    bytes([0xC2, 0x40, 0xE2, 0x80, 0xC2, 0x10, 0xE2, 0x20]):
+        ('32bit', 8, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)'),
 
     # 6-byte: CLC; XCE; REP #$40; SEP #$80 (native then 32-bit)
-    if b[0] == 0x18 and b[1] == 0xFB and b[2] == 0xC2 and b[3] == 0x40 and b[4] == 0xE2 and b[5] == 0x80:
-        return ('32bit', 6, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)')
+    bytes([0x18, 0xFB, 0xC2, 0x40, 0xE2, 0x80]):
+        ('32bit', 6, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)'),
 
     # 6-byte: CLC; XCE; REP #$80; SEP #$40 (native 16-bit)
-    if b[0] == 0x18 and b[1] == 0xFB and b[2] == 0xC2 and b[3] == 0x80 and b[4] == 0xE2 and b[5] == 0x40:
-        return ('16bit_m', 6, [0x02, 0x61, 0x01, 0xC2, 0x20],
-                'SEPE #$01 (W=01 native); REP #$20 (16-bit M)')
+    bytes([0x18, 0xFB, 0xC2, 0x80, 0xE2, 0x40]):
+        ('16bit_m', 6, [0x02, 0x61, 0x01, 0xC2, 0x20],
+         'SEPE #$01 (W=01 native); REP #$20 (16-bit M)'),
 
     # 4-byte: REP #$40; SEP #$80 (32-bit M)
-    if b[0] == 0xC2 and b[1] == 0x40 and b[2] == 0xE2 and b[3] == 0x80:
-        return ('32bit', 4, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)')
+    bytes([0xC2, 0x40, 0xE2, 0x80]):
+        ('32bit', 4, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)'),
 
     # 4-byte: REP #$10; SEP #$20 (32-bit X)
-    if b[0] == 0xC2 and b[1] == 0x10 and b[2] == 0xE2 and b[3] == 0x20:
-        return ('32bit', 4, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)')
+    bytes([0xC2, 0x10, 0xE2, 0x20]):
+        ('32bit', 4, [0x02, 0x61, 0x03], 'SEPE #$03 -> W=11 (32-bit)'),
 
     # 4-byte: REP #$80; SEP #$40 (16-bit M)
-    if b[0] == 0xC2 and b[1] == 0x80 and b[2] == 0xE2 and b[3] == 0x40:
-        return ('16bit_m', 4, [0x02, 0x61, 0x01, 0xC2, 0x20],
-                'SEPE #$01 (W=01); REP #$20 (16-bit M)')
+    bytes([0xC2, 0x80, 0xE2, 0x40]):
+        ('16bit_m', 4, [0x02, 0x61, 0x01, 0xC2, 0x20],
+         'SEPE #$01 (W=01); REP #$20 (16-bit M)'),
 
     # 2-byte: SEP #$40 (16-bit M via set M0)
-    if b[0] == 0xE2 and b[1] == 0x40:
-        return ('16bit_m', 2, [0x02, 0x61, 0x01, 0xC2, 0x20],
-                'SEPE #$01 (W=01); REP #$20 (16-bit M)')
+    bytes([0xE2, 0x40]):
+        ('16bit_m', 2, [0x02, 0x61, 0x01, 0xC2, 0x20],
+         'SEPE #$01 (W=01); REP #$20 (16-bit M)'),
 
     # 2-byte: SEP #$10 (16-bit X via set X0)
-    if b[0] == 0xE2 and b[1] == 0x10:
-        return ('16bit_x', 2, [0x02, 0x61, 0x01, 0xC2, 0x10],
-                'SEPE #$01 (W=01); REP #$10 (16-bit X)')
+    bytes([0xE2, 0x10]):
+        ('16bit_x', 2, [0x02, 0x61, 0x01, 0xC2, 0x10],
+         'SEPE #$01 (W=01); REP #$10 (16-bit X)'),
+}
+
+MODE_PATTERN_LENGTHS = sorted({len(seq) for seq in MODE_PATTERNS}, reverse=True)
+
+
+# Trailing comments on the replacement poke lines: pattern_name -> {byte offset: comment}
+REPLACEMENT_COMMENTS = {
+    '32bit': {0: '  -- SEPE #$03', 2: '  -- set W1+W0 -> W=11 (32-bit)'},
+    '16bit_m': {0: '  -- SEPE #$01', 2: '  -- set W0 -> W=01 (native)',
+                3: '  -- REP #$20', 4: '  -- clear M -> 16-bit acc'},
+    '16bit_x': {0: '  -- SEPE #$01', 2: '  -- set W0 -> W=01 (native)',
+                3: '  -- REP #$10', 4: '  -- clear X -> 16-bit idx'},
+}
+
+
+def replacement_lines(pat_name, new_bytes, desc):
+    """Build the (unindented) poke lines that replace a mode entry pattern."""
+    comments = REPLACEMENT_COMMENTS.get(pat_name, {})
+    return [f'-- {desc}\n'] + [
+        f'poke(16#{0x8000 + i:04X}#, x"{byte_val:02X}");{comments.get(i, "")}\n'
+        for i, byte_val in enumerate(new_bytes)
+    ]
+
+
+# Replacement poke lines for each pattern, built once: (pattern_name, description) -> lines
+REPLACEMENT_LINES = {
+    (pat_name, desc): replacement_lines(pat_name, new_bytes, desc)
+    for pat_name, _, new_bytes, desc in MODE_PATTERNS.values()
+}
+
+
+def identify_mode_pattern(code):
+    """Identify old-style mode entry pattern from the bytes poked at $8000+.
+
+    code is the memory image starting at $8000 (unpoked bytes are 0).
+    Returns: (pattern_name, pattern_length_bytes, replacement_bytes, description)
+    or None if no conversion needed.
+    """
+    prefix = bytes(code[:8])
+
+    # Longest patterns first; patterns of the same length never share a prefix
+    for length in MODE_PATTERN_LENGTHS:
+        pattern = MODE_PATTERNS.get(prefix[:length])
+        if pattern is not None:
+            return pattern
 
     return None
 
 
-def convert_sub_program(lines, sub_start, sub_end):
-    """Convert a single sub-program's mode entry pattern. Returns (modified_lines, did_convert)."""
-    pokes = extract_pokes_in_range(lines, sub_start, sub_end)
+def convert_sub_program(lines, poke_index, sub_start, sub_end):
+    """Convert a single sub-program's mode entry pattern in place. Returns did_convert.
+
+    poke_index entries for lines before sub_start stay valid, so sub-programs
+    must be converted from the end of the file backwards.
+    """
+    pokes = extract_pokes_in_range(poke_index, sub_start, sub_end)
     if not pokes:
-        return lines, False
+        return False
 
-    # Build byte map from pokes at $8000+
-    code = {}
+    # Build byte image of $8000-$80FF from pokes; a value too wide for a byte
+    # can't be part of a mode entry pattern, so it is stored as 0 (no pattern
+    # contains 0), replacing any earlier poke to that address
+    code = bytearray(0x100)
+    has_entry = False
     for _, addr, data, _ in pokes:
         if 0x8000 <= addr < 0x8100:
-            code[addr] = data
+            code[addr - 0x8000] = data if data < 0x100 else 0
+        has_entry = has_entry or addr == 0x8000
 
-    pattern = identify_mode_pattern(code)
+    pattern = identify_mode_pattern(code) if has_entry else None
     if pattern is None:
-        return lines, False
+        return False
 
     pat_name, old_len, new_bytes, desc = pattern
-    new_len = len(new_bytes)
-    delta = new_len - old_len
-
-    modified_lines = list(lines)
+    delta = len(new_bytes) - old_len
+    code_start = 0x8000 + old_len  # First byte after the old mode entry
 
     # Find all poke lines in this sub-program and categorize them
-    poke_lines_info = []
-    for i in range(sub_start, sub_end):
-        matches = list(POKE_PAT.finditer(modified_lines[i]))
-        if matches:
-            poke_info = []
-            for m in matches:
-                addr = int(m.group(2), 16)
-                data = int(m.group(4), 16)
-                poke_info.append((addr, data, m))
-            poke_lines_info.append((i, poke_info))
+    poke_lines_info = [(i, poke_index[i]) for i in range(sub_start, sub_end) if i in poke_index]
 
     lines_to_replace = []
     lines_to_shift = []
 
     for line_idx, poke_info in poke_lines_info:
-        has_mode_entry = any(0x8000 <= addr < 0x8000 + old_len for addr, _, _ in poke_info)
-        has_code = any(addr >= 0x8000 + old_len for addr, _, _ in poke_info)
+        has_mode_entry = any(0x8000 <= addr < code_start for addr, _, _ in poke_info)
+        has_code = any(addr >= code_start for addr, _, _ in poke_info)
         has_data = any(addr < 0x8000 for addr, _, _ in poke_info)
 
         if has_mode_entry and not has_code and not has_data:
@@ -189,80 +243,54 @@ def convert_sub_program(lines, sub_start, sub_end):
             lines_to_shift.append((line_idx, poke_info))
 
     if not lines_to_replace and not lines_to_shift:
-        return lines, False
-
-    # Generate new mode-entry poke lines
-    if lines_to_replace:
-        first_line = modified_lines[lines_to_replace[0]]
-        indent = re.match(r'^(\s*)', first_line).group(1)
-    else:
-        indent = '        '
-
-    new_poke_lines = []
-    new_poke_lines.append(f'{indent}-- {desc}\n')
-    for i, byte_val in enumerate(new_bytes):
-        addr = 0x8000 + i
-        comment = ''
-        if pat_name == '32bit':
-            if i == 0: comment = '  -- SEPE #$03'
-            elif i == 2: comment = '  -- set W1+W0 -> W=11 (32-bit)'
-        elif pat_name == '16bit_m':
-            if i == 0: comment = '  -- SEPE #$01'
-            elif i == 2: comment = '  -- set W0 -> W=01 (native)'
-            elif i == 3: comment = '  -- REP #$20'
-            elif i == 4: comment = '  -- clear M -> 16-bit acc'
-        elif pat_name == '16bit_x':
-            if i == 0: comment = '  -- SEPE #$01'
-            elif i == 2: comment = '  -- set W0 -> W=01 (native)'
-            elif i == 3: comment = '  -- REP #$10'
-            elif i == 4: comment = '  -- clear X -> 16-bit idx'
-
-        new_poke_lines.append(
-            f'{indent}poke(16#{addr:04X}#, x"{byte_val:02X}");{comment}\n'
-        )
+        return False
 
     # Shift addresses in subsequent poke lines
+    # (only the address digits change; the line is rebuilt in one pass)
     if delta != 0:
         for line_idx, poke_info in lines_to_shift:
-            line = modified_lines[line_idx]
-            new_line = line
-            for addr, data, match in reversed(poke_info):
-                if addr >= 0x8000 + old_len:
-                    new_addr = addr + delta
-                    new_addr_str = f'{new_addr:04X}'
-                    new_match = f'{match.group(1)}{new_addr_str}{match.group(3)}{match.group(4)}{match.group(5)}'
-                    new_line = new_line[:match.start()] + new_match + new_line[match.end():]
-            modified_lines[line_idx] = new_line
-
-    # Replace mode-entry lines
+            line = lines[line_idx]
+            parts = []
+            pos = 0
+            for addr, data, match in poke_info:
+                if addr >= code_start:
+                    parts.append(line[pos:match.start(2)])
+                    parts.append(f'{addr + delta:04X}')
+                    pos = match.end(2)
+            parts.append(line[pos:])
+            lines[line_idx] = ''.join(parts)
+
+    # Replace mode-entry lines with the pattern's prebuilt poke lines
     if lines_to_replace:
+        indent = INDENT_PAT.match(lines[lines_to_replace[0]]).group(1)
+        new_poke_lines = [indent + line for line in REPLACEMENT_LINES[pat_name, desc]]
+
         first_replace = min(lines_to_replace)
         last_replace = max(lines_to_replace)
 
         # Also check: is the line before the first replace a comment about the old program?
         comment_line = first_replace - 1
         if comment_line >= sub_start:
-            cl = modified_lines[comment_line].strip()
+            cl = lines[comment_line].strip()
             if cl.startswith('--') and ('Program:' in cl or 'SEP' in cl or 'REP' in cl or 'M0' in cl or 'M1' in cl):
                 first_replace = comment_line
 
-        modified_lines[first_replace:last_replace + 1] = new_poke_lines
+        lines[first_replace:last_replace + 1] = new_poke_lines
 
-    return modified_lines, True
+    return True
 
 
-def convert_test(lines, test_id, start, end):
-    """Convert a test block, handling multiple sub-programs (reset cycles)."""
-    sub_programs = find_sub_programs(lines, start, end)
+def convert_test(lines, poke_index, rst_lines, test_id, start, end):
+    """Convert a test block in place, handling multiple sub-programs (reset cycles)."""
+    sub_programs = find_sub_programs(rst_lines, start, end)
 
     any_converted = False
     # Process sub-programs in reverse order so line changes don't affect earlier indices
     for sub_start, sub_end in reversed(sub_programs):
-        lines, did_convert = convert_sub_program(lines, sub_start, sub_end)
-        if did_convert:
+        if convert_sub_program(lines, poke_index, sub_start, sub_end):
             any_converted = True
 
-    return lines, any_converted
+    return any_converted
 
 
 def main():
@@ -270,14 +298,13 @@ def main():
     filepath = args[0] if args else '/Users/benjamincooley/projects/m65832/tb/tb_m65832_core.vhd'
     dry_run = '--dry-run' in sys.argv
 
-    lines, tests = parse_test_blocks(filepath)
+    lines, tests, poke_index, rst_lines = parse_test_blocks(filepath)
 
     converted = 0
     skipped = 0
 
     for test_id, start, end in reversed(tests):
-        lines, did_convert = convert_test(lines, test_id, start, end)
-        if did_convert:
+        if convert_test(lines, poke_index, rst_lines, test_id, start, end):
             converted += 1
             print(f'  Converted test {test_id}', file=sys.stderr)
         else: